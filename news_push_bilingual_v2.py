@@ -4,26 +4,33 @@
 v2 每日推送：全球热点(自动翻译) + 国内热点 到微信（Server酱）
 ------------------------------------------------------------
 改动要点：
-- 使用 feedparser 优先解析 RSS（兼容性更强），失败再退回到 BeautifulSoup。
+- 使用 feedparser 优先解析 RSS（兼容性更强），失败再退回到 lxml（C 实现的 XML 解析）。
 - 更新更稳定的新闻源（BBC/CNN/Reuters；新华社/央视/澎湃）。
-- 加入请求重试、超时、UA 标头与简单限流，减少偶发失败。
+- 加入请求重试、超时、UA 标头与翻译并发上限（DeepL 4 / MyMemory 3），减少偶发失败。
+- RSS 用 asyncio + httpx（HTTP/2）并发下载，总耗时取决于最慢的源而非所有源之和。
 - 翻译链：OpenAI -> DeepL -> MyMemory（均可选；无密钥也能跑）。
+- 译文按标题哈希缓存 7 天（~/.cache/news_push），重复标题不再调用翻译接口。
+- 记录 48 小时内已推送的标题，跨次去重，避免每天收到同样的新闻。
 - 输出严格 Markdown，避免被微信折叠；链接显示域名。
 运行：
-  pip install requests beautifulsoup4 feedparser
+  pip install "httpx[http2]" lxml feedparser brotli orjson
   export SERVERCHAN_SENDKEY=你的Key
   python news_push_bilingual_v2.py
 """
 
 import os
+import re
 import time
-import json
-import html
-import requests
+import orjson
+import hashlib
+import functools
+import asyncio
+import httpx
 import feedparser
+import lxml.etree as ET
 from urllib.parse import urlparse, quote
 from datetime import datetime, timezone
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 
 TITLE = "今日热点简报｜全球 + 国内"
 TOP_K_PER_SOURCE = int(os.getenv("TOP_K_PER_SOURCE", "6"))
@@ -43,14 +50,42 @@ CHINA_RSS = [
 UA = os.getenv("HTTP_UA", "Mozilla/5.0 (NewsPushBot/2.0; +https://github.com/)")
 TIMEOUT = 20
 RETRIES = 2
-SLEEP_BETWEEN = 0.6  # 每个请求之间的间隔，避免触发限流
+ACCEPT_ENCODING = "gzip, br"  # RSS 压缩后体积通常只有 1/5~1/10；br 需要安装 brotli
+FEED_HEADERS = {
+    "User-Agent": UA,
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, text/xml;q=0.9, */*;q=0.8",
+}
+DEEPL_BATCH = 50  # DeepL 单次请求最多 50 条 text
+DEEPL_CONCURRENCY = 4  # DeepL 免费版最多约 5 个并发
+MYMEMORY_CONCURRENCY = 3  # MyMemory 只能承受 2~3 个并发
 
-session = requests.Session()
-adapter = requests.adapters.HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=0)
-session.mount("http://", adapter)
-session.mount("https://", adapter)
-session.headers.update({"User-Agent": UA})
+CJK_RE = re.compile("[\u4e00-\u9fff]")
+# 与 html.escape 等价的转义表，str.translate 一次扫描完成
+HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+# 按 local-name 匹配，RSS 2.0 / RSS 1.0(RDF) / Atom 的命名空间都能兼容
+XP_ITEMS = ET.XPath("//*[local-name()='item']")
+XP_ENTRIES = ET.XPath("//*[local-name()='entry']")
+XP_CHILD_TEXT = ET.XPath("string(*[local-name()=$name])")
+XP_LINK_HREF = ET.XPath("string(*[local-name()='link']/@href)")
+XML_PARSER = ET.XMLParser(recover=True, resolve_entities=False, no_network=True)
 
+# ==== 本地缓存（GitHub Actions 上由 actions/cache 跨次保留）====
+CACHE_DIR = os.path.expanduser(os.getenv("NEWS_PUSH_CACHE_DIR", "~/.cache/news_push"))
+TITLE_CACHE = os.path.join(CACHE_DIR, "titles.json")
+TITLE_CACHE_TTL = 7 * 24 * 3600  # 译文缓存 7 天
+SEEN_CACHE = os.path.join(CACHE_DIR, "seen.json")
+SEEN_TTL = 48 * 3600  # 已推送标题保留 48 小时
+
+# 翻译/推送用的同步客户端；HTTP/2 下同一站点只需一次 TLS 握手
+session = httpx.Client(
+    http2=True,
+    headers={"User-Agent": UA, "Accept-Encoding": ACCEPT_ENCODING},
+    limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+    follow_redirects=True,
+)
+
+@functools.lru_cache(maxsize=512)
 def host_of(link: str) -> str:
     try:
         return urlparse(link).netloc or "source"
@@ -63,49 +98,95 @@ def get_text(obj, default=""):
     except Exception:
         return default
 
-def fetch_via_feedparser(url, topk):
+def cache_key(*parts):
+    return hashlib.blake2b("|".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+def load_json(path):
+    try:
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def save_json(path, data):
     try:
-        d = feedparser.parse(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(orjson.dumps(data))
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+# 返回 (status, items)：ok 有条目；empty 是合法但暂时为空的 feed；error 解析失败
+def fetch_via_feedparser(body, topk, headers=None):
+    try:
+        # 已下载的字节直接交给 feedparser，附带响应头以便识别编码、补全相对链接
+        d = feedparser.parse(body, response_headers=headers)
         items = []
         for e in d.entries[:topk]:
             title = get_text(e.get("title", ""))
             link = get_text(e.get("link", ""))
             pub = get_text(e.get("published", "")) or get_text(e.get("updated", ""))
             items.append((title, link, pub, host_of(link)))
-        return items
+        if items:
+            return "ok", items
+        return ("empty" if d.get("version") else "error"), []
     except Exception:
-        return []
+        return "error", []
 
-def fetch_via_bs4(url, topk):
+def fetch_via_lxml(body, topk):
     try:
-        r = session.get(url, timeout=TIMEOUT)
-        r.raise_for_status()
-        soup = BeautifulSoup(r.text, "xml")
+        root = ET.fromstring(body, parser=XML_PARSER)
         items = []
-        for item in soup.find_all("item")[:topk]:
-            title = get_text(item.title.text if item.title else "")
-            link = get_text(item.link.text if item.link else "")
-            pub = get_text(item.pubDate.text if item.pubDate else "")
+        for item in XP_ITEMS(root)[:topk]:
+            title = get_text(XP_CHILD_TEXT(item, name="title"))
+            link = get_text(XP_CHILD_TEXT(item, name="link"))
+            pub = get_text(XP_CHILD_TEXT(item, name="pubDate"))
             items.append((title, link, pub, host_of(link)))
         if not items:
-            for entry in soup.find_all("entry")[:topk]:
-                title = get_text(entry.title.text if entry.title else "")
-                link_tag = entry.find("link")
-                link = get_text(link_tag.get("href") if link_tag else "")
-                pub = get_text(entry.updated.text if entry.find("updated") else "")
+            for entry in XP_ENTRIES(root)[:topk]:
+                title = get_text(XP_CHILD_TEXT(entry, name="title"))
+                link = get_text(XP_LINK_HREF(entry))
+                pub = get_text(XP_CHILD_TEXT(entry, name="updated"))
                 items.append((title, link, pub, host_of(link)))
         return items
     except Exception:
         return []
 
-def fetch_rss_items(url, topk):
+async def fetch_one(client, url):
     for i in range(RETRIES + 1):
-        items = fetch_via_feedparser(url, topk)
-        if not items:
-            items = fetch_via_bs4(url, topk)
+        try:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            headers = {
+                "content-type": resp.headers.get("Content-Type", ""),
+                "content-location": str(resp.url),
+            }
+            return url, resp.content, headers
+        except Exception:
+            if i < RETRIES:
+                await asyncio.sleep(1.2 + 0.3 * i)
+    return url, b"", {}
+
+async def gather_all(urls):
+    # HTTP/2 在每个站点的单条连接上多路复用，重定向后的 https 源同样受益
+    async with httpx.AsyncClient(http2=True, headers=FEED_HEADERS, timeout=TIMEOUT, follow_redirects=True) as client:
+        return await asyncio.gather(*(fetch_one(client, u) for u in urls))
+
+def fetch_rss_items(url, body, topk, headers=None):
+    # 下载失败已在 fetch_one 中重试；这里只区分解析结果
+    if body:
+        status, items = fetch_via_feedparser(body, topk, headers)
+        if status == "ok":
+            return items
+        if status == "empty":
+            # 源本身暂时为空，不算失败，也不必再用 lxml 解析一遍
+            return []
+        items = fetch_via_lxml(body, topk)
         if items:
             return items
-        time.sleep(1.2 + 0.3 * i)
     return [("【抓取失败】%s" % url, "", "", "error")]
 
 def dedup(items):
@@ -119,6 +200,28 @@ def dedup(items):
         out.append((t, l, p, h))
     return out
 
+def seen_key(title, host):
+    return cache_key(" ".join(title.split()).lower(), host)
+
+def load_seen():
+    now = time.time()
+    return {
+        k: v for k, v in load_json(SEEN_CACHE).items()
+        if isinstance(v, (int, float)) and now - v < SEEN_TTL
+    }
+
+def dedup_persistent(items, seen):
+    # 跨次去重：48 小时内已推送过的标题直接跳过，也省掉它们的翻译请求
+    return [x for x in items if x[3] == "error" or seen_key(x[0], x[3]) not in seen]
+
+def mark_seen(items, seen):
+    # 仍在榜上的标题每次都刷新时间戳（含被过滤掉的），否则 48 小时后会被再次推送
+    now = time.time()
+    for t, _, _, h in items:
+        if h != "error":
+            seen[seen_key(t, h)] = now
+    save_json(SEEN_CACHE, seen)
+
 # ===== 翻译模块 =====
 def translate_openai(texts):
     api_key = os.getenv("OPENAI_API_KEY")
@@ -126,17 +229,24 @@ def translate_openai(texts):
         return None
     url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1/chat/completions")
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    prompt = "将以下英文新闻标题逐条翻译成简洁的中文（保留专有名词），只返回JSON数组，不要其他文字：\n" + json.dumps(texts, ensure_ascii=False)
+    system = (
+        "将用户给出的 JSON 数组中的英文新闻标题逐条翻译成简洁的中文（保留专有名词）。"
+        "输出 JSON 对象，键 translations 为字符串数组，顺序和条数与输入一致。"
+    )
     payload = {
         "model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-        "messages": [{"role": "user", "content": prompt}],
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": orjson.dumps(texts).decode()},
+        ],
+        "response_format": {"type": "json_object"},
         "temperature": 0.2,
     }
     try:
-        resp = session.post(url, headers=headers, json=payload, timeout=40)
+        resp = session.post(url, headers=headers, content=orjson.dumps(payload), timeout=40)
         resp.raise_for_status()
-        content = resp.json()["choices"][0]["message"]["content"]
-        arr = json.loads(content)
+        content = orjson.loads(resp.content)["choices"][0]["message"]["content"]
+        arr = orjson.loads(content)["translations"]
         if isinstance(arr, list) and len(arr) == len(texts):
             return [str(x).strip() for x in arr]
         return None
@@ -148,49 +258,87 @@ def translate_deepl(texts):
     if not key:
         return None
     url = "https://api-free.deepl.com/v2/translate"
-    outs = []
+    def one(t):
+        data = {"auth_key": key, "text": t, "target_lang": "ZH"}
+        r = session.post(url, data=data, timeout=20)
+        r.raise_for_status()
+        return orjson.loads(r.content)["translations"][0]["text"]
     try:
-        for t in texts:
-            data = {"auth_key": key, "text": t, "target_lang": "ZH"}
-            r = session.post(url, data=data, timeout=20)
+        # 一次请求带多个 text 字段（上限 50 条），返回顺序与输入一致
+        outs = []
+        for i in range(0, len(texts), DEEPL_BATCH):
+            chunk = texts[i:i + DEEPL_BATCH]
+            data = {"auth_key": key, "target_lang": "ZH", "text": chunk}
+            r = session.post(url, data=data, timeout=40)
+            if r.status_code in (413, 414):
+                # 请求体过大时退回逐条翻译
+                with ThreadPoolExecutor(max_workers=DEEPL_CONCURRENCY) as ex:
+                    outs += list(ex.map(one, chunk))
+                continue
             r.raise_for_status()
-            outs.append(r.json()["translations"][0]["text"])
-            time.sleep(0.35)
+            outs += [x["text"] for x in orjson.loads(r.content)["translations"]]
         return outs if len(outs) == len(texts) else None
     except Exception:
         return None
 
 def translate_mymemory(texts):
-    outs = []
-    for t in texts:
+    def one(t):
         try:
             url = f"https://api.mymemory.translated.net/get?q={quote(t)}&langpair=en|zh-CN"
             r = session.get(url, timeout=20)
             r.raise_for_status()
-            data = r.json()
-            outs.append(data.get("responseData", {}).get("translatedText", t))
-            time.sleep(0.5)
+            data = orjson.loads(r.content)
+            # 额度用完或请求被拒时 HTTP 仍是 200，translatedText 里是错误提示
+            if str(data.get("responseStatus")) != "200" or data.get("quotaFinished"):
+                return t
+            return data.get("responseData", {}).get("translatedText", t)
         except Exception:
-            outs.append(t)
-    return outs
+            return t
+    with ThreadPoolExecutor(max_workers=MYMEMORY_CONCURRENCY) as ex:
+        return list(ex.map(one, texts))
+
+def looks_chinese(s):
+    # 只看前 8 个字符，正则在 C 层扫描，免去逐字符的 Python 循环
+    return CJK_RE.search(s, 0, 8) is not None
+
+# 返回 (译文, 是否可缓存)：只缓存 OpenAI/DeepL 的结果，MyMemory 兜底译文只用当天
+def translate_chain(texts):
+    outs = translate_openai(texts)
+    if outs:
+        return outs, True
+    outs = translate_deepl(texts)
+    if outs:
+        return outs, True
+    return translate_mymemory(texts), False
 
 def auto_translate(texts):
     if not texts:
         return []
-    def looks_chinese(s):
-        for ch in s[:8]:
-            if "\u4e00" <= ch <= "\u9fff":
-                return True
-        return False
     if all(looks_chinese(t) for t in texts):
         return texts
-    outs = translate_openai(texts)
-    if outs:
-        return outs
-    outs = translate_deepl(texts)
-    if outs:
-        return outs
-    return translate_mymemory(texts)
+    # 每日热点大量重复，已译过的标题直接走缓存，只把新标题送去翻译
+    now = time.time()
+    cache = {
+        k: v for k, v in load_json(TITLE_CACHE).items()
+        # 格式不对的条目直接丢弃，和 load_json 丢弃损坏文件一样
+        if isinstance(v, list) and len(v) == 2 and isinstance(v[0], str)
+        and isinstance(v[1], (int, float)) and now - v[1] < TITLE_CACHE_TTL
+    }
+    keys = [cache_key(t) for t in texts]
+    misses = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in cache))
+    if misses:
+        outs, cacheable = translate_chain(misses)
+        if len(outs) != len(misses):
+            outs, cacheable = misses, False
+        if cacheable:
+            for t, zh in zip(misses, outs):
+                if zh and zh != t:
+                    cache[cache_key(t)] = [zh, now]
+            save_json(TITLE_CACHE, cache)
+        fresh = dict(zip(misses, outs))
+    else:
+        fresh = {}
+    return [cache[k][0] if k in cache else fresh.get(t, t) for t, k in zip(texts, keys)]
 
 # ===== 发送 =====
 def send_serverchan(title, markdown):
@@ -204,43 +352,59 @@ def send_serverchan(title, markdown):
     return r.text
 
 # ===== 渲染 =====
+# 渲染模板预先绑定 .format，逐条渲染时不再重复解析 f-string
+GLOBAL_LINE = "{0}. {1}  \n    *{2}*  \n    [{3}]({4})".format
+GLOBAL_LINE_NOLINK = "{0}. {1}  \n    *{2}*".format
+CHINA_LINE = "{0}. {1}  \n    [{2}]({3})".format
+CHINA_LINE_NOLINK = "{0}. {1}".format
+
+def render_global(i, item, zh):
+    t, link, _, h = item
+    t = t.translate(HTML_ESCAPE)
+    zh = zh.translate(HTML_ESCAPE)
+    return GLOBAL_LINE(i, zh, t, h, link) if link else GLOBAL_LINE_NOLINK(i, zh, t)
+
+def render_china(i, item):
+    t, link, _, h = item
+    t = t.translate(HTML_ESCAPE)
+    return CHINA_LINE(i, t, h, link) if link else CHINA_LINE_NOLINK(i, t)
+
 def build_markdown(globals_items, china_items, translated):
     now = datetime.now(timezone.utc).astimezone().strftime("%Y-%m-%d %H:%M")
-    lines = []
-    lines.append(f"**{TITLE}**  \n更新：{now}\n")
-
-    lines.append("### 🌍 全球热点（已译）")
-    for i, (item, zh) in enumerate(zip(globals_items, translated), 1):
-        t, link, _, h = item
-        t = html.escape(t)
-        zh = html.escape(zh)
-        if link:
-            lines.append(f"{i}. {zh}  \n    *{t}*  \n    [{h}]({link})")
-        else:
-            lines.append(f"{i}. {zh}  \n    *{t}*")
-    lines.append("")
-
-    lines.append("### 🇨🇳 国内热点")
-    for i, (t, link, _, h) in enumerate(china_items, 1):
-        t = html.escape(t)
-        if link:
-            lines.append(f"{i}. {t}  \n    [{h}]({link})")
-        else:
-            lines.append(f"{i}. {t}")
-    return "\n".join(lines)
+    n_global = range(1, len(globals_items) + 1)
+    n_china = range(1, len(china_items) + 1)
+    return "\n".join([
+        f"**{TITLE}**  \n更新：{now}\n",
+        "### 🌍 全球热点（已译）",
+        *map(render_global, n_global, globals_items, translated),
+        "",
+        "### 🇨🇳 国内热点",
+        *map(render_china, n_china, china_items),
+    ])
 
 def main():
+    seen = load_seen()
+    results = asyncio.run(gather_all(GLOBAL_RSS + CHINA_RSS))
+    fetched = {u: (body, headers) for u, body, headers in results}
+
     g_items = []
     for src in GLOBAL_RSS:
-        g_items += fetch_rss_items(src, TOP_K_PER_SOURCE)
-        time.sleep(SLEEP_BETWEEN)
-    g_items = dedup(g_items)
+        body, headers = fetched[src]
+        g_items += fetch_rss_items(src, body, TOP_K_PER_SOURCE, headers)
+    g_fetched = dedup(g_items)
+    g_items = dedup_persistent(g_fetched, seen)
 
     c_items = []
     for src in CHINA_RSS:
-        c_items += fetch_rss_items(src, TOP_K_PER_SOURCE)
-        time.sleep(SLEEP_BETWEEN)
-    c_items = dedup(c_items)
+        body, headers = fetched[src]
+        c_items += fetch_rss_items(src, body, TOP_K_PER_SOURCE, headers)
+    c_fetched = dedup(c_items)
+    c_items = dedup_persistent(c_fetched, seen)
+
+    if not g_items and not c_items:
+        mark_seen(g_fetched + c_fetched, seen)
+        print("没有新的热点，跳过推送")
+        return
 
     g_titles = [x[0] for x in g_items]
     translated = auto_translate(g_titles)
@@ -249,6 +413,7 @@ def main():
 
     md = build_markdown(g_items, c_items, translated)
     resp = send_serverchan(TITLE, md)
+    mark_seen(g_fetched + c_fetched, seen)
     print(resp)
 
 if __name__ == "__main__":